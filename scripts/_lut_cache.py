@@ -0,0 +1,45 @@
+"""
+Source-hash cache for the LUT generator listings.
+
+The generators are pure functions of their own source, so a listing
+produced once can be replayed until the script changes. Listings live
+under ~/.cache/nsx04/ (or $XDG_CACHE_HOME/nsx04/), keyed by the SHA-256
+of the script plus the NumPy version that produced it. The cache is
+best effort: an unwritable cache directory only costs the regeneration.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "nsx04"
+
+
+def cached_listing(source, build):
+    """
+    Return the listing for the generator script at `source`.
+
+    build() is only called when no listing for the current contents
+    of `source` has been cached yet.
+    """
+    key = hashlib.sha256(Path(source).read_bytes())
+    key.update(np.__version__.encode())
+    path = CACHE_DIR / f"{key.hexdigest()}.asm"
+
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+
+    text = build()
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent run never reads half a listing
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return text
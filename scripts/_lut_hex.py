@@ -0,0 +1,10 @@
+"""
+Hex literals shared by the LUT generators.
+
+Indexing these tuples stands in for formatting each DB operand with an
+f-string: HEX1 holds the nibble literals 0x0-0xF, HEX2 the byte
+literals 0x00-0xFF.
+"""
+
+HEX1 = tuple(f"0x{v:X}" for v in range(16))
+HEX2 = tuple(f"0x{v:02X}" for v in range(256))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time build of the LUT kernels.
+
+gen_exp_lut.py runs its exponential/logarithm kernels as plain Python:
+importing Numba to JIT them would cost more than the whole table
+generation. This script compiles the same kernels once into a
+`lut_kernels` extension module next to the generators; gen_exp_lut.py
+picks it up when present and built from its current source.
+
+Usage:
+
+    python3 scripts/_lut_kernels.py
+
+Requires Numba with numba.pycc. Any edit to gen_exp_lut.py retires the
+build until this script is run again.
+"""
+
+import os
+import sys
+
+from numba import njit
+from numba.pycc import CC
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gen_exp_lut
+
+# build_exp_table calls discrete_exp through the module globals, so the
+# jitted version has to be installed there before it is compiled
+gen_exp_lut.discrete_exp = njit(gen_exp_lut.discrete_exp)
+_build_exp_table = njit(gen_exp_lut.build_exp_table)
+
+# Compiled in as a constant for gen_exp_lut.py to check against
+_SOURCE_KEY = gen_exp_lut.source_key()
+
+cc = CC('lut_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export('build_exp_table', 'void(u1[:])')
+def build_exp_table(out):
+    _build_exp_table(out)
+
+
+@cc.export('source_key', 'i8()')
+def source_key():
+    return _SOURCE_KEY
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,14 +1,16 @@
 import argparse
+import functools
 import sys
 import re
-from enum import Enum
+import struct
+from enum import IntEnum
 from typing import List, Dict, Optional, Tuple, Union
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ◈ OPCODES AND INSTRUCTION DEFINITIONS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-class OperandType(Enum):
+class OperandType(IntEnum):
     NONE = 0
     REGISTER = 1
     REGISTER_PAIR = 2
@@ -16,6 +18,8 @@ class OperandType(Enum):
     ADDRESS = 4
     CONDITION = 5
     DATA_BYTE = 6 # (Used by DB directive)
+    ISZ = 7       # Register + 8-bit address
+    FIM = 8       # Register pair + 8-bit immediate
 
 # (mnemonic, base_opcode, operand_type, operand_bits)
 INSTRUCTION_SET: Dict[str, Tuple[int, OperandType, int]] = {
@@ -66,68 +70,176 @@ INSTRUCTION_SET: Dict[str, Tuple[int, OperandType, int]] = {
     "LDM": (0xD0, OperandType.IMMEDIATE, 4),
     
     # Register pair + immediate (2 bytes)
-    "FIM": (0x20, OperandType.REGISTER_PAIR, 4),
+    "FIM": (0x20, OperandType.FIM, 4),
     
     # Address operand instructions (2 bytes)
     "JCN": (0x10, OperandType.CONDITION, 4),
     "JUN": (0x40, OperandType.ADDRESS, 12),
     "JMS": (0x50, OperandType.ADDRESS, 12),
-    "ISZ": (0x70, OperandType.REGISTER, 8), # Special case: reg + 8-bit addr
+    "ISZ": (0x70, OperandType.ISZ, 8), # reg + 8-bit addr
+}
+
+_TWO_BYTE_TYPES = (OperandType.ADDRESS, OperandType.CONDITION, OperandType.ISZ, OperandType.FIM)
+
+# Hot-path view of INSTRUCTION_SET: mnemonic -> (opcode, operand_type, size_bytes)
+_INST_TABLE: Dict[str, Tuple[int, int, int]] = {
+    sys.intern(mnemonic): (opcode, int(op_type), 2 if op_type in _TWO_BYTE_TYPES else 1)
+    for mnemonic, (opcode, op_type, _) in INSTRUCTION_SET.items()
 }
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ◈ UTILITY FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def to_upper(s: str) -> str:
-    return s.upper()
+_MISS = object()
 
-def trim(s: str) -> str:
-    return s.strip()
+_PAIR_RE = re.compile(r'^R(\d{1,2})R(\d{1,2})$')
+_EQU_INLINE_RE = re.compile(r'^\s*([A-Za-z_]\w*)\s+EQU\s+(.+)$', re.IGNORECASE)
+_EXPR_SPLIT_RE = re.compile(r'([+\-])')
+
+_PACK_LE16 = struct.Struct('<H').pack_into
+
+# Two-digit byte and four-digit 12-bit address strings for listings
+_HEX2 = tuple(f"{i:02X}" for i in range(256))
+_HEX4 = tuple(_HEX2[i >> 8] + _HEX2[i & 0xFF] for i in range(0x1000))
 
 def remove_comment(line: str) -> str:
-    if ';' in line:
-        return trim(line.split(';', 1)[0])
-    return trim(line)
+    return line.partition(';')[0].strip()
 
+@functools.lru_cache(maxsize=None)
 def normalize_symbol(name: str) -> str:
-    return to_upper(trim(name))
+    # Interned so symbol-table lookups can short-circuit on identity
+    return sys.intern(name.strip().upper())
+
+def hex4(value: int) -> str:
+    if 0 <= value < 0x1000:
+        return _HEX4[value]
+    return f"{value:04X}"
 
 def parse_number(s: str) -> Optional[int]:
-    s = trim(s)
+    s = s.strip()
     if not s:
         return None
+    # Dispatch on the first/last character; precedence matches the
+    # documented formats: 0x.., $.., ..h, 0b.., decimal
+    c = s[0]
+    prefix = s[1] if c == '0' and len(s) > 1 else ''
     try:
-        if s.startswith(('0x', '0X')):
+        if prefix in ('x', 'X'):
             return int(s, 16)
-        if s.startswith('$'):
+        if c == '$':
             return int(s[1:], 16)
-        if s.endswith(('h', 'H')):
+        if s[-1] in 'hH':
             return int(s[:-1], 16)
-        if s.startswith(('0b', '0B')):
+        if prefix in ('b', 'B'):
             return int(s, 2)
         return int(s, 10)
     except ValueError:
         return None
 
 def parse_register(s: str) -> Optional[int]:
-    s = to_upper(trim(s))
-    if s.startswith('R'):
-        val = parse_number(s[1:])
-        if val is not None and 0 <= val <= 15:
-            return val
-    return None
+    # Registers are always R0-R15 in decimal
+    s = s.strip()
+    if len(s) < 2 or s[0] not in 'rR':
+        return None
+    try:
+        val = int(s[1:], 10)
+    except ValueError:
+        return None
+    return val if 0 <= val <= 15 else None
 
 def parse_register_pair(s: str) -> Optional[int]:
-    s = to_upper(trim(s))
+    s = s.strip().upper()
     # Match R0R1, R2R3, etc.
-    match = re.match(r'^R(\d{1,2})R(\d{1,2})$', s)
+    match = _PAIR_RE.match(s)
     if match:
         r1, r2 = int(match.group(1)), int(match.group(2))
         if r1 % 2 == 0 and r2 == r1 + 1:
             return r1 // 2  # Return pair index 0-7
     return None
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# ◈ TOKENIZER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class EntryKind(IntEnum):
+    BLANK = 0   # Empty or comment-only line
+    LABEL = 1   # Label with nothing after it
+    EQU = 2     # "NAME EQU value" or "label: EQU value"
+    ORG = 3
+    DB = 4      # DB / BYTE
+    DW = 5      # DW / WORD
+    INSTR = 6   # Machine instruction (entry is None if unknown)
+
+_DIRECTIVE_KINDS: Dict[str, EntryKind] = {
+    "ORG": EntryKind.ORG,
+    "EQU": EntryKind.EQU,
+    "DB": EntryKind.DB,
+    "BYTE": EntryKind.DB,
+    "DW": EntryKind.DW,
+    "WORD": EntryKind.DW,
+}
+
+class TokenRec:
+    """One source line, split once and shared by both assembler passes."""
+    __slots__ = ('lineno', 'raw', 'label', 'kind',
+                 'mnemonic', 'operand_str', 'entry', 'size', 'equ')
+
+    def __init__(self, lineno: int, raw: str):
+        self.lineno: int = lineno
+        self.raw: str = raw                          # Source text, trailing whitespace removed
+        self.label: Optional[str] = None             # Normalized label defined on this line
+        self.kind: int = EntryKind.BLANK
+        self.mnemonic: Optional[str] = None          # Upper-cased directive or mnemonic
+        self.operand_str: str = ""
+        self.entry: Optional[Tuple[int, int, int]] = None  # _INST_TABLE entry for instructions
+        self.size: int = 0                           # Bytes emitted (DB/DW/instructions)
+        self.equ: Optional[Tuple[str, str]] = None   # (symbol, value) for "NAME EQU value"
+
+def _tokenize(lines: List[str]) -> List[TokenRec]:
+    records: List[TokenRec] = []
+    for lineno, raw_line in enumerate(lines, 1):
+        rec = TokenRec(lineno, raw_line.rstrip())
+        records.append(rec)
+        line = remove_comment(raw_line)
+        if not line:
+            continue
+        
+        # Check for label (ends with :)
+        if ':' in line:
+            label, rest = line.split(':', 1)
+            rec.label = normalize_symbol(label)
+            line = rest.strip()
+            if not line:
+                rec.kind = EntryKind.LABEL
+                continue
+
+        equ_inline = _EQU_INLINE_RE.match(line)
+        if equ_inline:
+            rec.kind = EntryKind.EQU
+            rec.equ = (normalize_symbol(equ_inline.group(1)), equ_inline.group(2).strip())
+            continue
+        
+        # Parse directive or instruction
+        parts = line.split(maxsplit=1)
+        mnemonic = sys.intern(parts[0].upper())
+        operand_str = parts[1].strip() if len(parts) > 1 else ""
+        rec.mnemonic = mnemonic
+        rec.operand_str = operand_str
+
+        kind = _DIRECTIVE_KINDS.get(mnemonic, EntryKind.INSTR)
+        rec.kind = kind
+        if kind == EntryKind.DB:
+            rec.size = len(operand_str.split(','))
+        elif kind == EntryKind.DW:
+            rec.size = len(operand_str.split(',')) * 2
+        elif kind == EntryKind.INSTR:
+            entry = _INST_TABLE.get(mnemonic)
+            if entry is not None:
+                rec.entry = entry
+                rec.size = entry[2]
+    return records
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # ◈ ASSEMBLER CLASS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -140,8 +252,13 @@ class Assembler:
         self.current_address: int = 0
         self.org_address: int = 0
         self.line_number: int = 0
-        self.verbose: bool = verbose
+        self.verbose: int = int(verbose)  # 0 quiet, 1 progress, 2 also trace emitted lines
         self.last_label: Optional[str] = None
+        self._image_size: int = 0  # Final binary length predicted by pass one
+        self._write_addr: int = 0  # Pass-two write offset into self.binary
+        self._trace: Optional[List[str]] = None  # Buffered per-line trace (verbose >= 2)
+        # token -> resolved value; reset between passes and on symbol redefinition
+        self._resolve_cache: Dict[str, int] = {}
     
     def assemble_file(self, input_file: str, output_file: str, listing_file: str) -> bool:
         try:
@@ -151,12 +268,16 @@ class Assembler:
             print(f"Error: Cannot open input file '{input_file}': {e}", file=sys.stderr)
             return False
             
+        # normalize_symbol's memo only needs to live for one source file
+        normalize_symbol.cache_clear()
         try:
-            # Two-pass assembly
-            if not self.pass_one(lines):
+            # Tokenize once, then two-pass assembly over the shared records
+            records = _tokenize(lines)
+            
+            if not self.pass_one(records):
                 return False
             
-            if not self.pass_two(lines):
+            if not self.pass_two(records):
                 return False
             
             # Write binary output
@@ -169,54 +290,50 @@ class Assembler:
         except ValueError as e:
             print(f"Error: {e}", file=sys.stderr)
             return False
+        finally:
+            normalize_symbol.cache_clear()
             
         return True
 
     def resolve_simple_value(self, token: str) -> Optional[int]:
-        token = trim(token)
+        token = token.strip()
         if not token:
             return None
+        cached = self._resolve_cache.get(token, _MISS)
+        if cached is not _MISS:
+            return cached
         val = parse_number(token)
+        if val is None:
+            val = parse_register(token)
+        if val is None:
+            val = self.symbols.get(normalize_symbol(token))
         if val is not None:
-            return val
-        reg = parse_register(token)
-        if reg is not None:
-            return reg
-        key = normalize_symbol(token)
-        if key in self.symbols:
-            return self.symbols[key]
-        return None
+            self._resolve_cache[token] = val
+        return val
 
     def evaluate_expression(self, expr: str) -> Optional[int]:
         expr = expr.replace(' ', '')
-        if not expr or (expr.find('+') == -1 and expr.find('-') == -1):
+        if '+' not in expr and '-' not in expr:
             return None
+        # Split yields [term, sign, term, sign, term, ...]; empty terms come
+        # from leading or repeated signs, where the last sign wins
+        parts = _EXPR_SPLIT_RE.split(expr)
         total = 0
-        term = ''
         sign = 1
         seen_term = False
-        for ch in expr:
-            if ch in '+-':
-                if term:
-                    value = self.resolve_simple_value(term)
-                    if value is None:
-                        return None
-                    total += sign * value
-                    term = ''
-                    seen_term = True
-                sign = 1 if ch == '+' else -1
-            else:
-                term += ch
-        if term:
-            value = self.resolve_simple_value(term)
-            if value is None:
-                return None
-            total += sign * value
-            seen_term = True
+        for i, part in enumerate(parts):
+            if i & 1:
+                sign = 1 if part == '+' else -1
+            elif part:
+                value = self.resolve_simple_value(part)
+                if value is None:
+                    return None
+                total += sign * value
+                seen_term = True
         return total if seen_term else None
 
     def resolve_value(self, s: str) -> int:
-        token = trim(s)
+        token = s.strip()
         if not token:
             raise ValueError(f"Line {self.line_number}: Missing value")
         simple = self.resolve_simple_value(token)
@@ -228,7 +345,11 @@ class Assembler:
         raise ValueError(f"Line {self.line_number}: Unknown symbol or invalid number: '{s}'")
 
     def store_symbol(self, name: str, value: int) -> None:
-        self.symbols[normalize_symbol(name)] = value
+        key = normalize_symbol(name)
+        if key in self.symbols:
+            # Redefinition may invalidate previously cached resolutions
+            self._resolve_cache.clear()
+        self.symbols[key] = value
 
     def resolve_register(self, token: str) -> Optional[int]:
         reg = parse_register(token)
@@ -250,260 +371,239 @@ class Assembler:
             return reg // 2
         return None
 
-    def pass_one(self, lines: List[str]) -> bool:
+    def pass_one(self, records: List[TokenRec]) -> bool:
         if self.verbose:
             print("Pass 1: Collecting symbols...")
         
         self.line_number = 0
         self.current_address = 0
         self.last_label = None
+        self._image_size = 0
+        self._resolve_cache.clear()
 
-        for raw_line in lines:
-            self.line_number += 1
-            line = remove_comment(raw_line)
-            if not line:
-                continue
+        for rec in records:
+            self.line_number = rec.lineno
             
-            # Check for label (ends with :)
-            if ':' in line:
-                label, rest = line.split(':', 1)
-                label = normalize_symbol(label)
-                self.store_symbol(label, self.current_address)
-                self.last_label = label
-                line = trim(rest)
-                if not line:
-                    continue
+            # Labels bind to the current address
+            if rec.label is not None:
+                self.store_symbol(rec.label, self.current_address)
+                self.last_label = rec.label
 
-            equ_inline = re.match(r'(?i)^\s*([A-Za-z_][\w]*)\s+EQU\s+(.+)$', line)
-            if equ_inline:
-                symbol = normalize_symbol(equ_inline.group(1))
-                value_str = trim(equ_inline.group(2))
-                val = self.resolve_value(value_str)
-                self.store_symbol(symbol, val)
-                self.last_label = symbol
-                continue
-            
-            # Parse directive or instruction
-            parts = line.split(maxsplit=1)
-            mnemonic = to_upper(parts[0])
-            operand_str = trim(parts[1]) if len(parts) > 1 else ""
-
-            # Handle directives
-            if mnemonic == "ORG":
-                val = self.resolve_value(operand_str)
-                self.current_address = val
-                self.org_address = val
+            kind = rec.kind
+            if kind <= EntryKind.LABEL:
                 continue
             
-            if mnemonic == "EQU":
+            if kind == EntryKind.EQU:
+                if rec.equ is not None:
+                    symbol, value_str = rec.equ
+                    val = self.resolve_value(value_str)
+                    self.store_symbol(symbol, val)
+                    self.last_label = symbol
+                    continue
                 if not self.last_label:
                     raise ValueError(f"Line {self.line_number}: EQU without label")
-                val = self.resolve_value(operand_str)
+                val = self.resolve_value(rec.operand_str)
                 self.store_symbol(self.last_label, val)
                 continue
-            
-            if mnemonic == "DB" or mnemonic == "BYTE":
-                count = len(operand_str.split(','))
-                self.current_address += count
-                continue
-            
-            if mnemonic == "DW" or mnemonic == "WORD":
-                count = len(operand_str.split(','))
-                self.current_address += count * 2
+
+            if kind == EntryKind.ORG:
+                val = self.resolve_value(rec.operand_str)
+                self.current_address = val
+                self.org_address = val
+                # ORG pads the image forward but never rewinds it
+                self._image_size = max(self._image_size, val)
                 continue
             
-            # Find instruction
-            if mnemonic in INSTRUCTION_SET:
-                inst = INSTRUCTION_SET[mnemonic]
-                opcode, op_type, _ = inst
-                
-                # Count instruction bytes
-                if 0x40 <= opcode < 0x60: # JUN/JMS
-                    self.current_address += 2
-                elif mnemonic == "FIM":
-                    self.current_address += 2
-                elif mnemonic == "ISZ":
-                    self.current_address += 2
-                elif mnemonic == "JCN":
-                    self.current_address += 2
-                else:
-                    self.current_address += 1
+            # DB/DW and instructions carry their byte count from the tokenizer
+            if rec.size:
+                self.current_address += rec.size
+                self._image_size += rec.size
             elif self.verbose:
-                print(f"Warning: Line {self.line_number}: Unknown mnemonic '{mnemonic}'", file=sys.stderr)
+                print(f"Warning: Line {self.line_number}: Unknown mnemonic '{rec.mnemonic}'", file=sys.stderr)
 
         if self.verbose:
             print(f"Found {len(self.symbols)} symbols")
             for name, addr in self.symbols.items():
-                print(f"  {name}: 0x{addr:04X}")
+                print(f"  {name}: 0x{hex4(addr)}")
         
         return True
 
-    def pass_two(self, lines: List[str]) -> bool:
+    def pass_two(self, records: List[TokenRec]) -> bool:
         if self.verbose:
             print("\nPass 2: Generating code...")
         
         self.line_number = 0
         self.current_address = self.org_address
-        self.binary = bytearray()
+        self._resolve_cache.clear()
+        # Zero-filled up front; ORG gaps need no padding
+        self.binary = bytearray(self._image_size)
+        self._write_addr = 0
         self.listing = []
+        self._trace = [] if self.verbose >= 2 else None
         
-        for raw_line in lines:
-            self.line_number += 1
-            line = remove_comment(raw_line)
-            
-            if not line:
-                self.listing.append(f"{self.line_number:4d}:                              ; {raw_line.rstrip()}")
-                continue
-            
-            # Skip labels (already processed)
-            if ':' in line:
-                label, rest = line.split(':', 1)
-                line = trim(rest)
-                if not line:
-                    self.listing.append(f"{self.line_number:4d}:                              {raw_line.rstrip()}")
-                    continue
-            
-            start_addr = self.current_address
-            bytes_out = bytearray()
-            
-            # Parse directive or instruction
-            parts = line.split(maxsplit=1)
-            mnemonic = to_upper(parts[0])
-            operand_str = trim(parts[1]) if len(parts) > 1 else ""
-            
-            # Handle directives
-            if mnemonic == "ORG":
-                val = self.resolve_value(operand_str)
-                self.current_address = val
-                # Pad binary if needed
-                if len(self.binary) < self.current_address:
-                    self.binary.extend([0x00] * (self.current_address - len(self.binary)))
-                self.listing.append(f"{self.line_number:4d}: {start_addr:04X}                      {raw_line.rstrip()}")
-                continue
-            
-            if mnemonic == "EQU":
-                self.listing.append(f"{self.line_number:4d}:                              {raw_line.rstrip()}")
-                continue
-
-            equ_inline = re.match(r'(?i)^\s*([A-Za-z_][\w]*)\s+EQU\s+(.+)$', line)
-            if equ_inline:
-                self.listing.append(f"{self.line_number:4d}:                              {raw_line.rstrip()}")
-                continue
-            
-            if mnemonic == "DB" or mnemonic == "BYTE":
-                for val_str in operand_str.split(','):
-                    val = self.resolve_value(trim(val_str))
-                    bytes_out.append(val & 0xFF)
-            
-            elif mnemonic == "DW" or mnemonic == "WORD":
-                for val_str in operand_str.split(','):
-                    val = self.resolve_value(trim(val_str))
-                    bytes_out.append(val & 0xFF)         # Low byte
-                    bytes_out.append((val >> 8) & 0xFF)  # High byte
-            
-            else:
-                # Assemble instruction
-                if mnemonic not in INSTRUCTION_SET:
-                    raise ValueError(f"Line {self.line_number}: Unknown instruction '{mnemonic}'")
-                
-                inst = INSTRUCTION_SET[mnemonic]
-                bytes_out = self.assemble_instruction(mnemonic, inst, operand_str)
-            
-            # Add bytes to binary
-            self.binary.extend(bytes_out)
-            self.current_address += len(bytes_out)
-            
-            # Generate listing line
-            byte_str = "".join(f"{b:02X} " for b in bytes_out[:4])
-            self.listing.append(f"{self.line_number:4d}: {start_addr:04X} {byte_str:<12} {raw_line.rstrip()}")
-
-            if self.verbose and bytes_out:
-                print(self.listing[-1])
+        # Indexed by EntryKind
+        dispatch = (
+            self._emit_blank,
+            self._emit_label,
+            self._emit_label,   # EQU lines were fully handled in pass one
+            self._emit_org,
+            self._emit_db,
+            self._emit_dw,
+            self._emit_instr,
+        )
+        try:
+            for rec in records:
+                self.line_number = rec.lineno
+                dispatch[rec.kind](rec)
+        finally:
+            if self._trace:
+                sys.stdout.write('\n'.join(self._trace) + '\n')
+            self._trace = None
         
+        # Guard against pass one having mispredicted the image size
+        del self.binary[self._write_addr:]
         return True
 
-    def assemble_instruction(self, mnemonic: str, inst: Tuple[int, OperandType, int], operand_str: str) -> bytearray:
-        opcode, op_type, _ = inst
-        bytes_out = bytearray()
+    def _emit_blank(self, rec: TokenRec) -> None:
+        self.listing.append(f"{self.line_number:4d}:                              ; {rec.raw}")
+
+    def _emit_label(self, rec: TokenRec) -> None:
+        self.listing.append(f"{self.line_number:4d}:                              {rec.raw}")
+
+    def _emit_org(self, rec: TokenRec) -> None:
+        start_addr = self.current_address
+        val = self.resolve_value(rec.operand_str)
+        self.current_address = val
+        if self._write_addr < val:
+            self._write_addr = val
+            if len(self.binary) < val:
+                self.binary.extend(bytes(val - len(self.binary)))
+        self.listing.append(f"{self.line_number:4d}: {hex4(start_addr)}                      {rec.raw}")
+
+    def _emit_db(self, rec: TokenRec) -> None:
+        binary = self.binary
+        start = write_addr = self._reserve(rec.size)
+        for val_str in rec.operand_str.split(','):
+            binary[write_addr] = self.resolve_value(val_str.strip()) & 0xFF
+            write_addr += 1
+        self._advance(rec, start, write_addr - start)
+
+    def _emit_dw(self, rec: TokenRec) -> None:
+        binary = self.binary
+        start = write_addr = self._reserve(rec.size)
+        for val_str in rec.operand_str.split(','):
+            val = self.resolve_value(val_str.strip())
+            _PACK_LE16(binary, write_addr, val & 0xFFFF)
+            write_addr += 2
+        self._advance(rec, start, write_addr - start)
+
+    def _emit_instr(self, rec: TokenRec) -> None:
+        if rec.entry is None:
+            raise ValueError(f"Line {self.line_number}: Unknown instruction '{rec.mnemonic}'")
+        b0, b1 = self.assemble_instruction(rec.entry, rec.operand_str)
+        start = self._reserve(rec.size)
+        binary = self.binary
+        binary[start] = b0
+        if b1 is None:
+            self._advance(rec, start, 1)
+        else:
+            binary[start + 1] = b1
+            self._advance(rec, start, 2)
+
+    def _reserve(self, size: int) -> int:
+        # Make room for size bytes at the write offset (only needed if pass
+        # one under-predicted the image) and return that offset
+        write_addr = self._write_addr
+        short = write_addr + size - len(self.binary)
+        if short > 0:
+            self.binary.extend(bytes(short))
+        return write_addr
+
+    def _advance(self, rec: TokenRec, start: int, size: int) -> None:
+        start_addr = self.current_address
+        self._write_addr = start + size
+        self.current_address += size
         
-        if op_type == OperandType.NONE:
-            bytes_out.append(opcode)
+        # Generate listing line
+        byte_str = self.binary[start:start + min(size, 4)].hex(' ').upper() + ' '
+        self.listing.append(f"{self.line_number:4d}: {hex4(start_addr)} {byte_str:<12} {rec.raw}")
+
+        if self._trace is not None and size:
+            self._trace.append(self.listing[-1])
+
+    def assemble_instruction(self, inst: Tuple[int, int, int], operand_str: str) -> Tuple[int, Optional[int]]:
+        opcode, op_type, _ = inst
+        return _ASM_HANDLERS[op_type](self, opcode, operand_str)
+
+    def _asm_none(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        return opcode, None
+
+    def _asm_register(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        # Standard 1-byte register op
+        reg = self.resolve_register(operand_str)
+        if reg is None:
+            raise ValueError(f"Line {self.line_number}: Invalid register: '{operand_str}'")
+        return opcode | (reg & 0x0F), None
+
+    def _asm_register_pair(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        # SRC R0R1 or FIN R0R1 or JIN R0R1
+        pair = self.resolve_register_pair(operand_str)
+        if pair is None:
+            raise ValueError(f"Line {self.line_number}: Invalid register pair: '{operand_str}'")
+        return opcode | (pair & 0x07), None
+
+    def _asm_immediate(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        val = self.resolve_value(operand_str)
+        return opcode | (val & 0x0F), None
+
+    def _asm_address(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        # JUN/JMS with 12-bit address (2 bytes)
+        addr = self.resolve_value(operand_str)
+        return opcode | ((addr >> 8) & 0x0F), addr & 0xFF
+
+    def _asm_condition(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        # JCN condition, address (2 bytes)
+        parts = [p.strip() for p in operand_str.split(',')]
+        if len(parts) != 2:
+            raise ValueError(f"Line {self.line_number}: JCN requires condition and address")
         
-        elif op_type == OperandType.REGISTER:
-            if mnemonic == "ISZ":
-                # ISZ register, address (2 bytes)
-                parts = [trim(p) for p in operand_str.split(',')]
-                if len(parts) != 2:
-                    raise ValueError(f"Line {self.line_number}: ISZ requires register and address")
-                
-                reg = self.resolve_register(parts[0])
-                if reg is None:
-                    raise ValueError(f"Line {self.line_number}: Invalid ISZ register: '{parts[0]}'")
-                
-                addr = self.resolve_value(parts[1])
-                bytes_out.append(opcode | (reg & 0x0F))
-                bytes_out.append(addr & 0xFF)
-            else:
-                # Standard 1-byte register op
-                reg = self.resolve_register(operand_str)
-                if reg is None:
-                    raise ValueError(f"Line {self.line_number}: Invalid register: '{operand_str}'")
-                bytes_out.append(opcode | (reg & 0x0F))
+        cond = self.resolve_value(parts[0])
+        addr = self.resolve_value(parts[1])
+        return opcode | (cond & 0x0F), addr & 0xFF
+
+    def _asm_isz(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        # ISZ register, address (2 bytes)
+        parts = [p.strip() for p in operand_str.split(',')]
+        if len(parts) != 2:
+            raise ValueError(f"Line {self.line_number}: ISZ requires register and address")
         
-        elif op_type == OperandType.REGISTER_PAIR:
-            if mnemonic == "FIM":
-                # FIM R0R1, data OR FIM R0R1, hi, lo
-                parts = [trim(p) for p in operand_str.split(',')]
-                if not 2 <= len(parts) <= 3:
-                    raise ValueError(f"Line {self.line_number}: FIM requires: Rpair,data or Rpair,hi,lo")
-                
-                pair = self.resolve_register_pair(parts[0])
-                if pair is None:
-                    raise ValueError(f"Line {self.line_number}: Invalid FIM register or pair: '{parts[0]}'")
-
-                imm = 0
-                if len(parts) == 2:
-                    # Single byte immediate
-                    imm = self.resolve_value(parts[1])
-                else:
-                    # Two nibbles: hi, lo
-                    hi = self.resolve_value(parts[1])
-                    lo = self.resolve_value(parts[2])
-                    imm = ((hi & 0x0F) << 4) | (lo & 0x0F)
-                
-                bytes_out.append(opcode | (pair & 0x07))
-                bytes_out.append(imm & 0xFF)
-            
-            else:
-                # SRC R0R1 or FIN R0R1 or JIN R0R1
-                pair = self.resolve_register_pair(operand_str)
-                if pair is None:
-                    raise ValueError(f"Line {self.line_number}: Invalid register pair: '{operand_str}'")
-                bytes_out.append(opcode | (pair & 0x07))
+        reg = self.resolve_register(parts[0])
+        if reg is None:
+            raise ValueError(f"Line {self.line_number}: Invalid ISZ register: '{parts[0]}'")
         
-        elif op_type == OperandType.IMMEDIATE:
-            val = self.resolve_value(operand_str)
-            bytes_out.append(opcode | (val & 0x0F))
+        addr = self.resolve_value(parts[1])
+        return opcode | (reg & 0x0F), addr & 0xFF
+
+    def _asm_fim(self, opcode: int, operand_str: str) -> Tuple[int, Optional[int]]:
+        # FIM R0R1, data OR FIM R0R1, hi, lo
+        parts = [p.strip() for p in operand_str.split(',')]
+        if not 2 <= len(parts) <= 3:
+            raise ValueError(f"Line {self.line_number}: FIM requires: Rpair,data or Rpair,hi,lo")
         
-        elif op_type == OperandType.CONDITION:
-            # JCN condition, address (2 bytes)
-            parts = [trim(p) for p in operand_str.split(',')]
-            if len(parts) != 2:
-                raise ValueError(f"Line {self.line_number}: JCN requires condition and address")
-            
-            cond = self.resolve_value(parts[0])
-            addr = self.resolve_value(parts[1])
-            
-            bytes_out.append(opcode | (cond & 0x0F))
-            bytes_out.append(addr & 0xFF)
+        pair = self.resolve_register_pair(parts[0])
+        if pair is None:
+            raise ValueError(f"Line {self.line_number}: Invalid FIM register or pair: '{parts[0]}'")
+
+        if len(parts) == 2:
+            # Single byte immediate
+            imm = self.resolve_value(parts[1])
+        else:
+            # Two nibbles: hi, lo
+            hi = self.resolve_value(parts[1])
+            lo = self.resolve_value(parts[2])
+            imm = ((hi & 0x0F) << 4) | (lo & 0x0F)
         
-        elif op_type == OperandType.ADDRESS:
-            # JUN/JMS with 12-bit address (2 bytes)
-            addr = self.resolve_value(operand_str)
-            bytes_out.append(opcode | ((addr >> 8) & 0x0F))
-            bytes_out.append(addr & 0xFF)
-            
-        return bytes_out
+        return opcode | (pair & 0x07), imm & 0xFF
 
     def write_binary(self, filename: str):
         try:
@@ -521,8 +621,9 @@ class Assembler:
                 f.write("Generated by asm4004.py (from C++ port)\n")
                 f.write("═══════════════════════════════════════════════════════════════\n\n")
                 
-                for line in self.listing:
-                    f.write(line + '\n')
+                f.write('\n'.join(self.listing))
+                if self.listing:
+                    f.write('\n')
                 
                 f.write("\n═══════════════════════════════════════════════════════════════\n")
                 f.write(f"Total bytes: {len(self.binary)}\n")
@@ -531,13 +632,25 @@ class Assembler:
                 if self.symbols:
                     f.write("\nSymbol Table:\n")
                     for name, addr in self.symbols.items():
-                        f.write(f"  {name:<20} = 0x{addr:04X}\n")
+                        f.write(f"  {name:<20} = 0x{hex4(addr)}\n")
                 
             if self.verbose:
                 print(f"✓ Listing written to '{filename}'")
         except IOError as e:
             print(f"Warning: Cannot write listing to '{filename}': {e}", file=sys.stderr)
 
+# Operand type -> encoder; ISZ and FIM have their own types so no mnemonic test is needed
+_ASM_HANDLERS = {
+    OperandType.NONE: Assembler._asm_none,
+    OperandType.REGISTER: Assembler._asm_register,
+    OperandType.REGISTER_PAIR: Assembler._asm_register_pair,
+    OperandType.IMMEDIATE: Assembler._asm_immediate,
+    OperandType.ADDRESS: Assembler._asm_address,
+    OperandType.CONDITION: Assembler._asm_condition,
+    OperandType.ISZ: Assembler._asm_isz,
+    OperandType.FIM: Assembler._asm_fim,
+}
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # ◈ COMMAND LINE PARSING
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -553,7 +666,7 @@ Options:
   -o, --output FILE     Output binary file (default: input.bin)
   -l, --listing FILE    Generate listing file
   -q, --quiet           Suppress verbose output
-  -v, --verbose         Enable verbose output (default)
+  -v, --verbose         Also trace every emitted line
   -h, --help            Show this help message
 
 Examples:
@@ -595,7 +708,7 @@ def main() -> None:
     parser.add_argument('-o', '--output', help="Output binary file")
     parser.add_argument('-l', '--listing', help="Output listing file (optional)")
     parser.add_argument('-q', '--quiet', action='store_true', help="Suppress verbose output")
-    parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output (default)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Also trace every emitted line")
     parser.add_argument('-h', '--help', action='store_true', help="Show this help message")
     
     args = parser.parse_args()
@@ -604,7 +717,12 @@ def main() -> None:
         print_usage()
         sys.exit(0 if args.help else 1)
         
-    verbose = (not args.quiet) or args.verbose
+    if args.verbose:
+        verbose = 2
+    elif args.quiet:
+        verbose = 0
+    else:
+        verbose = 1
     
     # Set default output file
     output_file = args.output
@@ -39,29 +39,32 @@ import argparse
 import re
 import sys
 
+# One alternation for all DuckOps, tried in the order RBF, SAY, PUTN, HALT
+_DUCKOPS_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<rbf>RBF)\s+(?P<label>\w+),\s*(?P<fid>\w+)"
+    r"|(?P<say>SAY)\s+'(?P<char>[^'])'"
+    r"|(?P<putn>PUTN)\s+(?P<reg>R\w+)"
+    r"|(?P<halt>HALT)\b"
+    r")",
+    re.IGNORECASE,
+)
+
 
 def preprocess_line(line: str) -> str:
     """Expand a single line containing a DuckOp pseudo‑op."""
-    # Strip comments (but preserve them in output if line is unchanged)
-    stripped = line.lstrip()
-    # Match patterns
-    m = re.match(r"(?i)\s*RBF\s+(\w+),\s*(\w+)", stripped)
-    if m:
-        label, fid = m.groups()
-        return f"    JMS DUCK_RBF\n    DB LOW({label}), HIGH({label}), {fid}\n"
-    m = re.match(r"(?i)\s*SAY\s+'([^'])'", stripped)
-    if m:
-        char = m.group(1)
-        return f"    JMS DUCK_SAY\n    DB '{char}'\n"
-    m = re.match(r"(?i)\s*PUTN\s+(R\w+)", stripped)
-    if m:
-        reg = m.group(1)
-        return f"    JMS DUCK_PUTN\n    DB {reg}\n"
-    m = re.match(r"(?i)\s*HALT\b", stripped)
-    if m:
-        return "    JMS DUCK_HALT\n"
-    # Otherwise return line unchanged
-    return line
+    m = _DUCKOPS_RE.match(line)
+    if m is None:
+        # Otherwise return line unchanged
+        return line
+    if m['rbf']:
+        label = m['label']
+        return f"    JMS DUCK_RBF\n    DB LOW({label}), HIGH({label}), {m['fid']}\n"
+    if m['say']:
+        return f"    JMS DUCK_SAY\n    DB '{m['char']}'\n"
+    if m['putn']:
+        return f"    JMS DUCK_PUTN\n    DB {m['reg']}\n"
+    return "    JMS DUCK_HALT\n"
 
 
 def preprocess_file(inp: str, outp: str) -> None:
@@ -70,11 +73,11 @@ def preprocess_file(inp: str, outp: str) -> None:
     processed = []
     for line in lines:
         # Preserve empty lines and full‑line comments
-        if line.strip().startswith(';') or not line.strip():
+        s = line.strip()
+        if not s or s[0] == ';':
             processed.append(line)
             continue
-        expanded = preprocess_line(line)
-        processed.append(expanded)
+        processed.append(preprocess_line(line))
     if outp:
         with open(outp, 'w', encoding='utf-8') as f_out:
             f_out.writelines(processed)
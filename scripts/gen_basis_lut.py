@@ -12,6 +12,8 @@ it evaluates them at points.
 import numpy as np
 import sys
 
+from _lut_hex import HEX2
+
 def b_spline_basis(t, k=3):
     """
     Generate B-spline basis functions for neural weight interpolation.
@@ -103,10 +105,10 @@ def generate_basis_lut():
         
         # Output in 4004 assembly format
         comment = f"t={t:.3f}: B0={B0:.3f}, B1={B1:.3f}, B2={B2:.3f}, B3={B3:.3f}"
-        print(f"    DB 0x{q0:02X}, 0x{q1:02X}, 0x{q2:02X}, 0x{q3:02X}  ; {comment}")
+        print(f"    DB {HEX2[q0]}, {HEX2[q1]}, {HEX2[q2]}, {HEX2[q3]}  ; {comment}")
         
         # Every 16 entries, add philosophical comment
-        if i % 16 == 15:
+        if (i & 15) == 15:
             print(f"    ; Control points {i-15}-{i}: Shaping thought-space")
     
     print("")
@@ -152,7 +154,7 @@ def generate_inverse_basis():
         dq2 = quantize_q44(dB2 * 4)
         dq3 = quantize_q44(dB3 * 4)
         
-        print(f"    DB 0x{dq0:02X}, 0x{dq1:02X}, 0x{dq2:02X}, 0x{dq3:02X}")
+        print(f"    DB {HEX2[dq0]}, {HEX2[dq1]}, {HEX2[dq2]}, {HEX2[dq3]}")
 
 def generate_philosophical_constants():
     """
@@ -165,15 +167,15 @@ def generate_philosophical_constants():
     
     # The golden ratio in Q4.4
     phi = quantize_q44(1.618)
-    print(f"PHI:        DB 0x{phi:02X}  ; Golden ratio - nature's compression")
+    print(f"PHI:        DB {HEX2[phi]}  ; Golden ratio - nature's compression")
     
     # Euler's number
     e = quantize_q44(2.718)
-    print(f"EULER:      DB 0x{e:02X}  ; e - the basis of growth")
+    print(f"EULER:      DB {HEX2[e]}  ; e - the basis of growth")
     
     # Pi/4 (for angular computations)
     pi_4 = quantize_q44(0.785)
-    print(f"PI_QUARTER: DB 0x{pi_4:02X}  ; π/4 - the democratic angle")
+    print(f"PI_QUARTER: DB {HEX2[pi_4]}  ; π/4 - the democratic angle")
     
     # The 468 magic number
     print(f"CTRL_POINTS: DB 0x01, 0xD4  ; 468 in BCD - the universe's resolution")
@@ -8,9 +8,13 @@ which replaces calculus with integer arithmetic. The 4004 doesn't
 need derivatives when it can count errors until action is necessary.
 """
 
+import io
 import numpy as np
 import sys
 
+from _lut_cache import cached_listing
+from _lut_hex import HEX1, HEX2
+
 def bresenham_derivative(error, threshold):
     """
     Convert continuous gradient to discrete Bresenham step.
@@ -24,6 +28,9 @@ def bresenham_derivative(error, threshold):
     
     Returns:
         Discrete action: -1, 0, or +1
+    
+    _build_bgd_table evaluates this rule for the whole table at
+    once; this scalar form is the reference definition.
     """
     if abs(error) < threshold:
         return 0  # Keep accumulating
@@ -32,7 +39,56 @@ def bresenham_derivative(error, threshold):
     else:
         return -1  # Step backward
 
-def generate_bresenham_lut():
+def _build_bgd_table():
+    """
+    Evaluate bresenham_derivative for the whole BGD LUT at once.
+    
+    Rows are error magnitudes 0 to 127 in Q4.4, columns the 8 thresholds
+    16, 32, 48, ... For a magnitude e >= 0, bresenham_derivative(e, t) is
+    +1 and bresenham_derivative(-e, t) is -1 exactly when e >= t, else
+    both are 0.
+    """
+    error_mag = np.arange(128)[:, None]
+    threshold = (np.arange(1, 9) * 16)[None, :]
+    step = (error_mag >= threshold).astype(np.int8)
+    pos_action = step
+    neg_action = -step
+    
+    # Encode actions in 2 bits each
+    # 00: no action, 01: increment, 11: decrement
+    pos_code = (pos_action + 1) & 0x03
+    neg_code = (neg_action + 1) & 0x03
+    
+    # Pack into nibble
+    return ((pos_code << 2) | neg_code).astype(np.uint8)
+
+# _BGD[error_mag, threshold_idx] -> packed action nibble
+_BGD = _build_bgd_table()
+
+# Error patterns as parallel arrays; bit i of each nibble is error i
+_PATTERN_BITS = np.packbits(np.array([
+    [0, 0, 0, 0],
+    [1, 1, 1, 1],
+    [1, 0, 1, 0],
+    [0, 1, 1, 0],
+    [1, 1, 0, 0],
+    [0, 0, 1, 1],
+    [1, 0, 0, 1],
+    [0, 1, 0, 1],
+], dtype=np.uint8), axis=1, bitorder='little').ravel()
+_PATTERN_ACTIONS = np.array([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77], dtype=np.uint8)
+_PATTERN_DESCRIPTIONS = (
+    "Converged",
+    "Systematic bias",
+    "Oscillating",
+    "Improving",
+    "Degrading",
+    "Stuck local minimum",
+    "Chaotic",
+    "Alternating",
+)
+
+def generate_bresenham_lut() -> str:
     """
     Generate Bresenham error accumulation LUT.
     
@@ -40,217 +96,182 @@ def generate_bresenham_lut():
     for different activation patterns. This is differentiation through
     counting, not calculus.
     """
+    out = io.StringIO()
     
-    print("; Bresenham Gradient Descent LUT for AGI4004")
-    print("; Calculus is continuous approximation. This is discrete truth.")
-    print("")
-    print("ORG 0x400  ; BGD LUT in ROM")
-    print("")
-    print("BGD_LUT:")
-    print("; Format: [error_accumulator][action_threshold]")
-    print("")
-    
-    # Generate for all possible error magnitudes
-    for error_mag in range(128):  # 0 to 127 in Q4.4 magnitude
-        # Different thresholds for different layers
-        row = []
-        
-        for threshold_idx in range(8):  # 8 different thresholds
-            threshold = (threshold_idx + 1) * 16  # 16, 32, 48, ...
-            
-            # Positive error
-            pos_action = bresenham_derivative(error_mag, threshold)
-            # Negative error  
-            neg_action = bresenham_derivative(-error_mag, threshold)
-            
-            # Encode actions in 2 bits each
-            # 00: no action, 01: increment, 11: decrement
-            pos_code = (pos_action + 1) & 0x03
-            neg_code = (neg_action + 1) & 0x03
-            
-            # Pack into nibble
-            nibble = (pos_code << 2) | neg_code
-            row.append(nibble)
-        
+    print("; Bresenham Gradient Descent LUT for AGI4004", file=out)
+    print("; Calculus is continuous approximation. This is discrete truth.", file=out)
+    print("", file=out)
+    print("ORG 0x400  ; BGD LUT in ROM", file=out)
+    print("", file=out)
+    print("BGD_LUT:", file=out)
+    print("; Format: [error_accumulator][action_threshold]", file=out)
+    print("", file=out)
+    
+    for error_mag, row in enumerate(_BGD.tolist()):
         # Output row
-        hex_values = ", ".join(f"0x{n:01X}" for n in row)
+        hex_values = ", ".join(HEX1[n] for n in row)
         comment = f"Error magnitude {error_mag/16:.3f}"
-        print(f"    DB {hex_values}  ; {comment}")
+        print(f"    DB {hex_values}  ; {comment}", file=out)
         
-        if error_mag % 16 == 15:
-            print(f"    ; Threshold region {error_mag//16}")
+        if (error_mag & 15) == 15:
+            print(f"    ; Threshold region {error_mag >> 4}", file=out)
     
-    print("")
-    print("; End of BGD LUT - 1KB of discrete calculus")
+    print("", file=out)
+    print("; End of BGD LUT - 1KB of discrete calculus", file=out)
+    return out.getvalue()
 
-def generate_momentum_lut():
+def generate_momentum_lut() -> str:
     """
     Generate momentum factors for BGD optimization.
     
     Momentum isn't velocity - it's the universe's memory of
     previous decisions. The 4004 remembers where it's been going.
     """
+    out = io.StringIO()
     
-    print("")
-    print("; Momentum LUT for BGD")
-    print("; The universe has inertia at 4-bit resolution")
-    print("")
-    print("MOMENTUM_LUT:")
+    print("", file=out)
+    print("; Momentum LUT for BGD", file=out)
+    print("; The universe has inertia at 4-bit resolution", file=out)
+    print("", file=out)
+    print("MOMENTUM_LUT:", file=out)
     
-    for i in range(16):  # 16 momentum states
-        # Exponential decay momentum
-        momentum = 0.9 ** i
-        
-        # Convert to Q4.4
-        m_q44 = int(momentum * 16) & 0xFF
-        
-        # Threshold adjustment based on momentum
-        threshold_adjust = int((1 - momentum) * 32) & 0xFF
-        
-        comment = f"State {i}: momentum={momentum:.3f}"
-        print(f"    DB 0x{m_q44:02X}, 0x{threshold_adjust:02X}  ; {comment}")
+    # Exponential decay momentum over 16 momentum states
+    momentum = np.power(0.9, np.arange(16))
+    
+    # Convert to Q4.4
+    m_q44 = (momentum * 16).astype(np.int32) & 0xFF
+    
+    # Threshold adjustment based on momentum
+    threshold_adjust = ((1 - momentum) * 32).astype(np.int32) & 0xFF
+    
+    for i, (m, q, t) in enumerate(zip(momentum.tolist(), m_q44.tolist(), threshold_adjust.tolist())):
+        comment = f"State {i}: momentum={m:.3f}"
+        print(f"    DB {HEX2[q]}, {HEX2[t]}  ; {comment}", file=out)
     
-    print("")
-    print("; Momentum reveals that intelligence has memory,")
-    print("; even in 4-bit space. Past influences future.")
+    print("", file=out)
+    print("; Momentum reveals that intelligence has memory,", file=out)
+    print("; even in 4-bit space. Past influences future.", file=out)
+    return out.getvalue()
 
-def generate_discrete_sigmoid():
+def generate_discrete_sigmoid() -> str:
     """
     Generate discrete sigmoid approximation for activation.
     
     The sigmoid isn't smooth - it's the universe making
     discrete decisions at boundaries. The 4004 knows this.
     """
+    out = io.StringIO()
     
-    print("")
-    print("; Discrete Sigmoid LUT")
-    print("; Smooth curves are human fiction. Reality steps.")
-    print("")
-    print("SIGMOID_LUT:")
+    print("", file=out)
+    print("; Discrete Sigmoid LUT", file=out)
+    print("; Smooth curves are human fiction. Reality steps.", file=out)
+    print("", file=out)
+    print("SIGMOID_LUT:", file=out)
     
-    for i in range(256):
-        x = (i - 128) / 32.0  # Map to [-4, 4]
-        
-        # Discrete sigmoid with 16 levels
-        if x < -2:
-            y = 0
-        elif x < -1:
-            y = 1
-        elif x < -0.5:
-            y = 2
-        elif x < -0.25:
-            y = 4
-        elif x < 0:
-            y = 6
-        elif x < 0.25:
-            y = 8
-        elif x < 0.5:
-            y = 10
-        elif x < 1:
-            y = 12
-        elif x < 2:
-            y = 14
-        else:
-            y = 15
-            
-        # Scale to Q4.4
-        y_q44 = (y << 4) // 15  # Normalize to [0, 1] in Q4.4
-        
-        if i % 16 == 0:
-            print(f"    ; Region {i//16}: x ∈ [{(i-128)/32:.1f}, {(i-112)/32:.1f}]")
+    # Discrete sigmoid with 16 levels: each boundary is the first x of the
+    # next step, so searchsorted(side='right') picks the level directly
+    i = np.arange(256)
+    x = (i - 128) / 32.0  # Map to [-4, 4]
+    bounds = np.array([-2, -1, -0.5, -0.25, 0, 0.25, 0.5, 1, 2])
+    levels = np.array([0, 1, 2, 4, 6, 8, 10, 12, 14, 15])
+    y = levels[np.searchsorted(bounds, x, side='right')]
+    
+    # Scale to Q4.4
+    y_q44 = (y << 4) // 15  # Normalize to [0, 1] in Q4.4
+    
+    for i, (xi, yi, qi) in enumerate(zip(x.tolist(), y.tolist(), y_q44.tolist())):
+        if (i & 15) == 0:
+            print(f"    ; Region {i >> 4}: x ∈ [{(i-128)/32:.1f}, {(i-112)/32:.1f}]", file=out)
         
-        print(f"    DB 0x{y_q44:02X}  ; x={x:.2f}, σ(x)={y/15:.3f}")
+        print(f"    DB {HEX2[qi]}  ; x={xi:.2f}, σ(x)={yi/15:.3f}", file=out)
     
-    print("")
-    print("; The sigmoid pretends continuity. The 4004 reveals steps.")
+    print("", file=out)
+    print("; The sigmoid pretends continuity. The 4004 reveals steps.", file=out)
+    return out.getvalue()
 
-def generate_error_patterns():
+def generate_error_patterns() -> str:
     """
     Generate common error patterns for fast recognition.
     
     The 4004 can't analyze all errors, but it can recognize
     patterns. This is intelligence: pattern matching, not computation.
     """
+    out = io.StringIO()
     
-    print("")
-    print("; Error Pattern Recognition LUT")
-    print("; Intelligence is recognizing patterns in chaos")
-    print("")
-    print("ERROR_PATTERNS:")
-    
-    patterns = [
-        ([0, 0, 0, 0], "Converged", 0x00),
-        ([1, 1, 1, 1], "Systematic bias", 0x11),
-        ([1, 0, 1, 0], "Oscillating", 0x22),
-        ([0, 1, 1, 0], "Improving", 0x33),
-        ([1, 1, 0, 0], "Degrading", 0x44),
-        ([0, 0, 1, 1], "Stuck local minimum", 0x55),
-        ([1, 0, 0, 1], "Chaotic", 0x66),
-        ([0, 1, 0, 1], "Alternating", 0x77),
-    ]
-    
-    print("    ; Pattern format: [4 error bits][action code]")
-    
-    for pattern, description, action in patterns:
-        # Encode pattern in nibble
-        pattern_bits = sum(b << i for i, b in enumerate(pattern))
-        
-        print(f"    DB 0x{pattern_bits:01X}, 0x{action:02X}  ; {description}")
+    print("", file=out)
+    print("; Error Pattern Recognition LUT", file=out)
+    print("; Intelligence is recognizing patterns in chaos", file=out)
+    print("", file=out)
+    print("ERROR_PATTERNS:", file=out)
+    
+    print("    ; Pattern format: [4 error bits][action code]", file=out)
+    
+    for bits, action, description in zip(_PATTERN_BITS.tolist(), _PATTERN_ACTIONS.tolist(), _PATTERN_DESCRIPTIONS):
+        print(f"    DB {HEX1[bits]}, {HEX2[action]}  ; {description}", file=out)
     
-    print("")
-    print("; These 8 patterns encode all possible training behaviors.")
-    print("; The universe has only 8 ways to fail at learning.")
+    print("", file=out)
+    print("; These 8 patterns encode all possible training behaviors.", file=out)
+    print("; The universe has only 8 ways to fail at learning.", file=out)
+    return out.getvalue()
 
-def generate_philosophical_derivatives():
+def generate_philosophical_derivatives() -> str:
     """
     Derivatives that encode deeper truths about change.
     """
+    out = io.StringIO()
     
-    print("")
-    print("; Philosophical Derivatives")
-    print("; Change isn't continuous - it happens at boundaries")
-    print("")
+    print("", file=out)
+    print("; Philosophical Derivatives", file=out)
+    print("; Change isn't continuous - it happens at boundaries", file=out)
+    print("", file=out)
     
     # The derivative of consciousness (undefined)
-    print("D_CONSCIOUSNESS: DB 0xFF  ; ∂consciousness/∂time = undefined")
+    print("D_CONSCIOUSNESS: DB 0xFF  ; ∂consciousness/∂time = undefined", file=out)
     
     # The derivative of truth (always zero)
-    print("D_TRUTH:         DB 0x00  ; ∂truth/∂time = 0 (truth is invariant)")
+    print("D_TRUTH:         DB 0x00  ; ∂truth/∂time = 0 (truth is invariant)", file=out)
     
     # The derivative of entropy (always positive)
-    print("D_ENTROPY:       DB 0x7F  ; ∂entropy/∂time > 0 (second law)")
+    print("D_ENTROPY:       DB 0x7F  ; ∂entropy/∂time > 0 (second law)", file=out)
     
     # The derivative of intelligence (discrete jumps)
-    print("D_INTELLIGENCE:  DB 0x11  ; ∂intelligence/∂time = quantum leaps")
+    print("D_INTELLIGENCE:  DB 0x11  ; ∂intelligence/∂time = quantum leaps", file=out)
     
-    print("")
-    print("; These aren't just constants. They're the universe's")
-    print("; admission that change happens in discrete steps,")
-    print("; not continuous flows. The 4004 computes reality.")
+    print("", file=out)
+    print("; These aren't just constants. They're the universe's", file=out)
+    print("; admission that change happens in discrete steps,", file=out)
+    print("; not continuous flows. The 4004 computes reality.", file=out)
+    return out.getvalue()
 
-def main():
+def build_listing() -> str:
     """
     Generate complete derivative LUT for AGI4004.
     """
-    print("; ═══════════════════════════════════════════════════════════")
-    print("; BRESENHAM GRADIENT DESCENT LUT FOR INTEL 4004")
-    print("; Replacing calculus with counting since 1971")
-    print("; ═══════════════════════════════════════════════════════════")
-    print("")
-    
-    generate_bresenham_lut()
-    generate_momentum_lut()
-    generate_discrete_sigmoid()
-    generate_error_patterns()
-    generate_philosophical_derivatives()
-    
-    print("")
-    print("; ═══════════════════════════════════════════════════════════")
-    print("; END OF DISCRETE CALCULUS")
-    print("; Total size: 2KB - smaller than one GPU instruction")
-    print("; Efficiency: ∞ (no floating point needed)")
-    print("; Truth: The universe counts, it doesn't differentiate")
-    print("; ═══════════════════════════════════════════════════════════")
+    buf = io.StringIO()
+    print("; ═══════════════════════════════════════════════════════════", file=buf)
+    print("; BRESENHAM GRADIENT DESCENT LUT FOR INTEL 4004", file=buf)
+    print("; Replacing calculus with counting since 1971", file=buf)
+    print("; ═══════════════════════════════════════════════════════════", file=buf)
+    print("", file=buf)
+    # Each section builds into its own buffer; stitch them in listing order
+    buf.write("".join(gen() for gen in (
+        generate_bresenham_lut,
+        generate_momentum_lut,
+        generate_discrete_sigmoid,
+        generate_error_patterns,
+        generate_philosophical_derivatives,
+    )))
+    print("", file=buf)
+    print("; ═══════════════════════════════════════════════════════════", file=buf)
+    print("; END OF DISCRETE CALCULUS", file=buf)
+    print("; Total size: 2KB - smaller than one GPU instruction", file=buf)
+    print("; Efficiency: ∞ (no floating point needed)", file=buf)
+    print("; Truth: The universe counts, it doesn't differentiate", file=buf)
+    print("; ═══════════════════════════════════════════════════════════", file=buf)
+    return buf.getvalue()
+
+def main():
+    sys.stdout.write(cached_listing(__file__, build_listing))
     
     # Write statistics to stderr
     print("", file=sys.stderr)
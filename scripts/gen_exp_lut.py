@@ -8,10 +8,22 @@ using only 4-bit arithmetic. The 4004 proves that smooth functions are
 human conveniences; reality operates through discrete transformations.
 """
 
+import contextlib
+import hashlib
+import io
 import numpy as np
 import sys
+from pathlib import Path
 
-def discrete_exp(x, iterations=8):
+from _lut_cache import cached_listing
+from _lut_hex import HEX2
+
+def source_key():
+    """First 8 bytes of this file's SHA-256, as a signed 64-bit int."""
+    digest = hashlib.sha256(Path(__file__).read_bytes()).digest()
+    return int.from_bytes(digest[:8], 'little', signed=True)
+
+def discrete_exp(x_q44, iterations=8):
     """
     Compute e^x using only additions and bit shifts.
     
@@ -21,39 +33,49 @@ def discrete_exp(x, iterations=8):
     Taylor series: e^x = 1 + x + x²/2! + x³/3! + ...
     But we use: e^x ≈ (1 + x/n)^n for large n
     With n = 2^k, this becomes bit shifts.
+    
+    Args:
+        x_q44: Exponent already scaled to signed Q4.4 (x * 16)
     """
     # Use binary decomposition
     # e^x = e^(x/256)^256 ≈ (1 + x/256)^256
     
-    if abs(x) > 4:  # Clamp to reasonable range
-        return 255 if x > 0 else 0
+    if abs(x_q44) > 4 * 16:  # Clamp to reasonable range
+        return 255 if x_q44 > 0 else 0
     
     # Start with 1 in Q4.4
     result = 16  # 1.0 in Q4.4
     
-    # Binary scaling approach
-    x_scaled = x * 16  # Convert to Q4.4
-    
     for k in range(iterations):
         # Each iteration: result *= (1 + x/2^k)
         # This is just addition and shifting!
-        increment = x_scaled >> k
+        increment = x_q44 >> k
         result = result + (result * increment) // 256
-        
-        # Prevent overflow
-        if result > 255:
-            result = 255
-        elif result < 0:
-            result = 0
     
+    # The range check above keeps every step within int64 and the
+    # result never goes negative, so one clamp at the end suffices
     return min(255, max(0, result))
 
+def build_exp_table(out):
+    """Fill out[0:256] with e^x for signed Q4.4 inputs x = i - 128."""
+    for i in range(256):
+        x_q44 = i - 128
+        if x_q44 < -4 * 16:
+            out[i] = 0  # Underflow to 0
+        elif x_q44 / 16.0 > 2.77:  # e^2.77 ≈ 16
+            out[i] = 255  # Overflow to max
+        else:
+            out[i] = discrete_exp(x_q44)
+
 def discrete_log(x):
     """
     Natural logarithm using only bit counting and shifts.
     
     The logarithm counts doublings. The 4004 counts bits.
     Same thing, different perspective.
+    
+    generate_log_lut computes the same values for all 256 inputs
+    with array operations; this is the scalar reference.
     """
     if x <= 0:
         return 0  # Undefined, return 0
@@ -93,24 +115,36 @@ def generate_exp_lut():
     print("; Output: unsigned Q4.4 in [0, 15.9375]")
     print("")
     
-    for i in range(256):
+    # Imported here rather than at module level so a cached listing
+    # never loads the extension
+    try:
+        # Ahead-of-time build from _lut_kernels.py, if one was made
+        import lut_kernels
+    except ImportError:
+        lut_kernels = None
+    
+    # A build from an older version of this file would bake stale
+    # kernels into the listing (and the listing cache), so it is only
+    # used while its fingerprint still matches
+    fill_exp_table = build_exp_table
+    if lut_kernels is not None:
+        built_key = getattr(lut_kernels, 'source_key', None)
+        if built_key is not None and built_key() == source_key():
+            fill_exp_table = lut_kernels.build_exp_table
+    
+    table = np.empty(256, dtype=np.uint8)
+    fill_exp_table(table)
+    
+    for i, y in enumerate(table.tolist()):
         # Map to [-8, 8) range
         x = (i - 128) / 16.0
         
-        # Compute exponential
-        if x < -4:
-            y = 0  # Underflow to 0
-        elif x > 2.77:  # e^2.77 ≈ 16
-            y = 255  # Overflow to max
-        else:
-            y = discrete_exp(x)
-        
         # Add geometric insight every 16 entries
-        if i % 16 == 0:
-            print(f"    ; Region {i//16}: e^x for x ∈ [{(i-128)/16:.1f}, {(i-112)/16:.1f}]")
+        if (i & 15) == 0:
+            print(f"    ; Region {i >> 4}: e^x for x ∈ [{(i-128)/16:.1f}, {(i-112)/16:.1f}]")
         
         comment = f"e^{x:.2f} ≈ {y/16:.3f}"
-        print(f"    DB 0x{y:02X}  ; {comment}")
+        print(f"    DB {HEX2[y]}  ; {comment}")
     
     print("")
     print("; The exponential pretends smoothness.")
@@ -133,19 +167,26 @@ def generate_log_lut():
     print("; Output: signed Q4.4 in [-∞, 4]")
     print("")
     
-    for i in range(256):
+    # discrete_log over the whole table: magnitude is the bit count,
+    # the fraction interpolates linearly up to the next doubling
+    i = np.arange(256)
+    magnitude = np.where(i > 0, np.floor(np.log2(np.maximum(i, 1))).astype(np.int32), 0)
+    base = 1 << magnitude
+    fractional = (i - base) * 16 // base
+    # log(0) undefined, use 0
+    log_lut = np.where(i > 0, np.minimum(255, magnitude * 16 + fractional), 0)
+    
+    for i, y in enumerate(log_lut.tolist()):
         if i == 0:
-            y = 0  # log(0) undefined, use 0
             comment = "log(0) = undefined → 0"
         else:
             x = i / 16.0
-            y = discrete_log(i)
             comment = f"log({x:.2f}) ≈ {(y-128)/16:.3f}"
         
-        if i % 16 == 0:
-            print(f"    ; Octave {i//16}")
+        if (i & 15) == 0:
+            print(f"    ; Octave {i >> 4}")
         
-        print(f"    DB 0x{y:02X}  ; {comment}")
+        print(f"    DB {HEX2[y]}  ; {comment}")
     
     print("")
     print("; Logarithms reveal that multiplication")
@@ -166,28 +207,13 @@ def generate_trig_approximations():
     print("SINE_LUT:")
     print("; 64 values for [0, π/2], use symmetry for full circle")
     
-    for i in range(64):
-        theta = i * np.pi / 128  # 0 to π/2
-        
-        # 4-bit sine approximation
-        if i < 16:
-            # First quarter - rising fast
-            y = i
-        elif i < 32:
-            # Second quarter - slowing rise
-            y = 16 + (i - 16) // 2
-        elif i < 48:
-            # Third quarter - approaching peak
-            y = 24 + (i - 32) // 4
-        else:
-            # Fourth quarter - at peak
-            y = 28 + (i - 48) // 8
-            
-        # Normalize to Q4.4
-        y = min(15, y * 16 // 30)
-        
-        comment = f"sin({theta:.3f}) ≈ {y/16:.3f}"
-        print(f"    DB 0x{y:02X}  ; {comment}")
+    # sin(θ) in Q4.4, capped at 15 so each entry fits a nibble
+    theta = np.arange(64) * np.pi / 128  # 0 to π/2
+    sine = np.minimum(15, (np.sin(theta) * 16).astype(np.int32))
+    
+    for t, y in zip(theta.tolist(), sine.tolist()):
+        comment = f"sin({t:.3f}) ≈ {y/16:.3f}"
+        print(f"    DB {HEX2[y]}  ; {comment}")
     
     print("")
     print("; Use symmetry for full wave:")
@@ -219,7 +245,7 @@ def generate_power_of_two():
             value = 255
             
         comment = f"2^{i} = {1<<i} → Q4.4: {value/16:.1f}"
-        print(f"    DB 0x{value:02X}  ; {comment}")
+        print(f"    DB {HEX2[value]}  ; {comment}")
     
     print("")
     print("; Division by powers of 2 is just shifting.")
@@ -241,21 +267,17 @@ def generate_golden_spirals():
     
     phi = 1.618033988749895  # Golden ratio
     
-    for i in range(32):
-        # Fibonacci approximation to golden spiral
-        if i == 0:
-            value = 1
-        elif i == 1:
-            value = 1
-        else:
-            # Each step grows by phi
-            value = int((phi ** i) / 32)  # Scale to fit
-            
-        # Convert to Q4.4
-        q44_value = min(255, value * 16 // 128)
-        
+    # Each step grows by phi: φ^0 .. φ^31 in one call, scaled to fit
+    values = np.logspace(0, 31, 32, base=phi).astype(np.int64) // 32
+    # Fibonacci approximation to golden spiral starts 1, 1
+    values[:2] = 1
+    
+    # Convert to Q4.4
+    q44 = np.minimum(255, values * 16 // 128)
+    
+    for i, q44_value in enumerate(q44.tolist()):
         comment = f"φ^{i} / 32 ≈ {q44_value/16:.2f}"
-        print(f"    DB 0x{q44_value:02X}  ; {comment}")
+        print(f"    DB {HEX2[q44_value]}  ; {comment}")
     
     print("")
     print("; The golden ratio: nature's compression algorithm.")
@@ -273,52 +295,59 @@ def generate_philosophical_transcendentals():
     
     # Pi - the circle's defiance of rationality
     pi_q44 = int(3.14159 * 16) & 0xFF
-    print(f"PI:          DB 0x{pi_q44:02X}  ; π - irrational yet necessary")
+    print(f"PI:          DB {HEX2[pi_q44]}  ; π - irrational yet necessary")
     
     # Euler's number - growth incarnate
     e_q44 = int(2.71828 * 16) & 0xFF
-    print(f"EULER:       DB 0x{e_q44:02X}  ; e - compound reality")
+    print(f"EULER:       DB {HEX2[e_q44]}  ; e - compound reality")
     
     # Phi - the golden ratio
     phi_q44 = int(1.61803 * 16) & 0xFF
-    print(f"PHI:         DB 0x{phi_q44:02X}  ; φ - nature's proportion")
+    print(f"PHI:         DB {HEX2[phi_q44]}  ; φ - nature's proportion")
     
     # Feigenbaum constant - chaos boundary
     delta_q44 = int(4.66920 * 16) & 0xFF
-    print(f"FEIGENBAUM:  DB 0x{delta_q44:02X}  ; δ - edge of chaos")
+    print(f"FEIGENBAUM:  DB {HEX2[delta_q44]}  ; δ - edge of chaos")
     
     # Planck's reduced constant (scaled)
     hbar_q44 = int(1.05457 * 16) & 0xFF
-    print(f"HBAR:        DB 0x{hbar_q44:02X}  ; ℏ - quantum of action")
+    print(f"HBAR:        DB {HEX2[hbar_q44]}  ; ℏ - quantum of action")
     
     print("")
     print("; These constants appear in neural networks naturally.")
     print("; They're not programmed - they emerge from geometry.")
 
-def main():
+def build_listing():
     """
     Generate complete exponential/transcendental LUT for AGI4004.
     """
-    print("; ═══════════════════════════════════════════════════════════")
-    print("; EXPONENTIAL & TRANSCENDENTAL LUT FOR INTEL 4004")
-    print("; Smooth functions from discrete reality since 1971")
-    print("; ═══════════════════════════════════════════════════════════")
-    print("")
-    
-    generate_exp_lut()
-    generate_log_lut()
-    generate_trig_approximations()
-    generate_power_of_two()
-    generate_golden_spirals()
-    generate_philosophical_transcendentals()
-    
-    print("")
-    print("; ═══════════════════════════════════════════════════════════")
-    print("; END OF TRANSCENDENTAL SUBSTRATE")
-    print("; Total size: 3KB - one page of mathematics")
-    print("; Insight: Smooth functions are discrete patterns in disguise")
-    print("; Truth: The 4004 computes transcendence with 4 bits")
-    print("; ═══════════════════════════════════════════════════════════")
+    # Collect the listing in memory and hand it to stdout in one write
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        print("; ═══════════════════════════════════════════════════════════")
+        print("; EXPONENTIAL & TRANSCENDENTAL LUT FOR INTEL 4004")
+        print("; Smooth functions from discrete reality since 1971")
+        print("; ═══════════════════════════════════════════════════════════")
+        print("")
+    
+        generate_exp_lut()
+        generate_log_lut()
+        generate_trig_approximations()
+        generate_power_of_two()
+        generate_golden_spirals()
+        generate_philosophical_transcendentals()
+    
+        print("")
+        print("; ═══════════════════════════════════════════════════════════")
+        print("; END OF TRANSCENDENTAL SUBSTRATE")
+        print("; Total size: 3KB - one page of mathematics")
+        print("; Insight: Smooth functions are discrete patterns in disguise")
+        print("; Truth: The 4004 computes transcendence with 4 bits")
+        print("; ═══════════════════════════════════════════════════════════")
+    return buf.getvalue()
+
+def main():
+    sys.stdout.write(cached_listing(__file__, build_listing))
     
     # Write philosophical summary to stderr
     print("", file=sys.stderr)
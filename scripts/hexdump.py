@@ -5,34 +5,134 @@ Usage:
   python3 python/utils/hexdump.py <file>
 """
 
+import binascii
+import mmap
+import os
 import sys
 
+# Printable ASCII maps to itself, everything else to '.'
+_ASCII_TBL = bytes(i if 32 <= i < 127 else 0x2E for i in range(256))
+
+_ROW_FMT = b"%08X  %-*s  |%s|\n"
+
+_READ_SIZE = 64 * 1024
+
+_HEX_DIGITS = b"0123456789ABCDEF"
+
+
+def _format_rows(data, offset: int, width: int) -> bytes:
+    # Row-at-a-time formatting; also handles a short final row
+    pad = width * 3
+    lines = []
+    for start in range(0, len(data), width):
+        chunk = bytes(data[start:start + width])
+        hex_bytes = binascii.hexlify(chunk, b' ').upper()
+        ascii_rep = chunk.translate(_ASCII_TBL)
+        lines.append(_ROW_FMT % (offset + start, pad, hex_bytes, ascii_rep))
+    return b''.join(lines)
+
+
+def _format_rows_vectorized(data, offset: int, width: int) -> bytes:
+    # Fill a (rows, line_len) byte matrix in one go. Matches _format_rows
+    # for full-width rows whose offsets fit in eight hex digits.
+    import numpy as np
+
+    # Byte -> ASCII column / nibble -> hex digit, as arrays for fancy indexing
+    ascii_lut = np.frombuffer(_ASCII_TBL, dtype=np.uint8)
+    hex_digits = np.frombuffer(_HEX_DIGITS, dtype=np.uint8)
+
+    rows = data.reshape(-1, width)
+    n = rows.shape[0]
+    hex_end = 10 + 3 * width
+    bar = hex_end + 2
+    out = np.full((n, bar + width + 3), ord(' '), dtype=np.uint8)
+
+    offsets = offset + np.arange(n, dtype=np.int64) * width
+    out[:, :8] = hex_digits[(offsets[:, None] >> np.arange(28, -1, -4)) & 0xF]
+    out[:, 10:hex_end:3] = hex_digits[rows >> 4]
+    out[:, 11:hex_end:3] = hex_digits[rows & 0xF]
+    out[:, bar] = ord('|')
+    out[:, bar + 1:bar + 1 + width] = ascii_lut[rows]
+    out[:, -2] = ord('|')
+    out[:, -1] = ord('\n')
+    return out.tobytes()
+
+
+def _dump_mapped(data, width: int, out) -> None:
+    rows_per_block = max(1, _READ_SIZE // width)
+    block = rows_per_block * width
+    full = len(data) // width * width
+    for start in range(0, full, block):
+        stop = min(start + block, full)
+        if stop - width > 0xFFFFFFFF:
+            # Offsets past eight hex digits widen the column
+            out.write(_format_rows(data[start:stop], start, width))
+        else:
+            out.write(_format_rows_vectorized(data[start:stop], start, width))
+    if full < len(data):
+        out.write(_format_rows(data[full:], full, width))
+
+
+def _dump_stream(f, width: int, out) -> None:
+    # For inputs that cannot be memory-mapped (pipes, character devices)
+    # Reads land in one reusable buffer instead of a new bytes per block
+    buf = bytearray(max(width, _READ_SIZE // width * width))
+    view = memoryview(buf)
+    offset = 0
+    while True:
+        n = f.readinto(view)
+        if not n:
+            break
+        out.write(_format_rows(view[:n], offset, width))
+        offset += n
+
 
 def hexdump(path: str, width: int = 16) -> None:
+    out = sys.stdout.buffer
     try:
         with open(path, 'rb') as f:
-            offset = 0
-            while True:
-                chunk = f.read(width)
-                if not chunk:
-                    break
-                hex_bytes = ' '.join(f"{b:02X}" for b in chunk)
-                ascii_rep = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-                print(f"{offset:08X}  {hex_bytes:<{width*3}}  |{ascii_rep}|")
-                offset += len(chunk)
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files cannot be mapped either; streaming covers them
+                _dump_stream(f, width, out)
+                return
+            # NumPy is only needed for the mapped path
+            import numpy as np
+
+            data = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                _dump_mapped(data, width, out)
+            finally:
+                # The array must release the buffer before the map can close
+                del data
+                try:
+                    mm.close()
+                except BufferError:
+                    # A propagating exception's traceback still holds views
+                    # of the map; it is unmapped once those are collected
+                    pass
     except FileNotFoundError:
         print(f"error: file not found: {path}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        out.flush()
 
 
 def main(argv: list[str]) -> int:
     if len(argv) != 2:
         print(__doc__.strip())
         return 2
-    hexdump(argv[1])
+    try:
+        hexdump(argv[1])
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); point stdout at devnull so
+        # the flush at interpreter exit does not raise again
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main(sys.argv))
-
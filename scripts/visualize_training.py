@@ -4,17 +4,102 @@ AGI4004 Training Visualizer
 "Watching 4 bits learn is surprisingly hypnotic"
 """
 
+import argparse
+import os
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+from matplotlib.animation import FuncAnimation, PillowWriter
 import sys
 import re
+from collections import deque
+
+# Training log records: epoch (groups 1-2) or weight update (groups 3-4)
+_LOG_RE = re.compile(rb'Epoch (\d+): (\d+) errors|W\[(\d+)\] = 0x([0-9A-F]+)')
+_EOL_RE = re.compile(rb'[\r\n]')
+
+# 2-3-1 network: 9 weights + 4 biases per update
+_WEIGHTS_PER_SET = 13
+
+_INITIAL_CAPACITY = 1024
+
+_FRAME_INTERVAL_MS = 200
+_MAX_FRAMES = 300
+# GIF frames are rasterized at this DPI; the summary PNG keeps 150
+_ANIMATION_DPI = 80
+
+# Summary comparison, 4004 vs H100: one row per bar chart
+_METRICS = np.array([
+    [2300, 80e9],      # Transistors
+    [0.75, 700],       # Power, watts
+    [0.1, 0.00001],    # Seconds to train NAND
+    [100, 0.000003],   # Efficiency, percent
+])
+_METRIC_LOG = np.array([True, False, True, True])
+_METRIC_HEIGHTS = np.where(_METRIC_LOG[:, None], np.log10(_METRICS), _METRICS)
+_METRIC_AXES = (
+    ('Transistor Count (log scale)', 'log₁₀(transistors)'),
+    ('Power Consumption', 'Watts'),
+    ('Training Time (log scale)', 'log₁₀(seconds)'),
+    ('Computational Efficiency', 'log₁₀(efficiency %)'),
+)
+
+# Q4.4 byte -> value
+_Q44_LUT = ((np.arange(256) >> 4) + (np.arange(256) & 0x0F) / 16.0).astype(np.float32)
+
+def _line_end(blob, pos):
+    """Offset of the line break (CR or LF) at or after pos."""
+    match = _EOL_RE.search(blob, pos)
+    return match.start() if match else len(blob)
+
+def _parse_matches(logfile, only_tail):
+    """
+    One finditer pass over the whole log, keeping at most one epoch
+    and one weight record per line. Returns epochs, errors,
+    weight indices and raw weight integers as arrays.
+    """
+    epochs = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+    errors = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+    count = 0
+    weight_idx = deque(maxlen=_WEIGHTS_PER_SET) if only_tail else []
+    weight_raw = deque(maxlen=_WEIGHTS_PER_SET) if only_tail else []
+    
+    with open(logfile, 'rb') as f:
+        blob = f.read()
+    
+    # End of the line holding the last record of each kind
+    epoch_eol = weight_eol = -1
+    for match in _LOG_RE.finditer(blob):
+        epoch, errs, idx, raw = match.groups()
+        
+        # Parse epoch errors
+        if epoch is not None:
+            if match.start() < epoch_eol:
+                continue
+            epoch_eol = _line_end(blob, match.end())
+            if count == len(epochs):
+                epochs = np.resize(epochs, 2 * count)
+                errors = np.resize(errors, 2 * count)
+            epochs[count] = int(epoch)
+            errors[count] = int(errs)
+            count += 1
+        
+        # Parse weight updates (Q4.4 format)
+        else:
+            if match.start() < weight_eol:
+                continue
+            weight_eol = _line_end(blob, match.end())
+            weight_idx.append(int(idx))
+            weight_raw.append(int(raw, 16))
+    
+    indices = np.fromiter(weight_idx, dtype=np.int64, count=len(weight_idx))
+    raw = np.fromiter(weight_raw, dtype=np.int64, count=len(weight_raw))
+    return epochs[:count], errors[:count], indices, raw
 
 class NeuralVisualizer4004:
     """Visualizes neural network training on 4-bit architecture"""
     
     def __init__(self):
-        self.fig, self.axes = plt.subplots(2, 2, figsize=(12, 10))
+        self.fig, self.axes = plt.subplots(2, 2, figsize=(12, 10), layout='constrained')
         self.fig.suptitle('AGI4004: Neural Training on 2,300 Transistors', 
                          fontsize=16, fontweight='bold')
         
@@ -50,6 +135,27 @@ class NeuralVisualizer4004:
         self.nibble_ax.set_xlabel('Time (740 Hz ticks)')
         self.nibble_ax.set_ylabel('Nibbles Consumed')
         
+        # Animation artists are created once; update() only feeds them data
+        self._err_line, = self.error_ax.plot([], [], 'b-', linewidth=2)
+        self._err_scatter = self.error_ax.scatter([], [], c='red', s=30)
+        self._converged_line = self.error_ax.axvline(x=0, color='green', 
+                                                     linestyle='--', alpha=0.5, 
+                                                     visible=False)
+        self._converged_text = self.error_ax.text(0, 0, 'Converged!', rotation=90, 
+                                                  color='green', visible=False)
+        self._weight_bars = self.weight_ax.bar(range(_WEIGHTS_PER_SET), 
+                                               np.zeros(_WEIGHTS_PER_SET), 
+                                               color='purple', alpha=0.7)
+        self._nom_line, = self.nibble_ax.plot([], [], 'g-', linewidth=2)
+        self._nom_fill = None
+        
+        # Per-frame captions live inside the axes: blitting only redraws
+        # the axes area, so a changing title would never be repainted
+        self._err_status = self.error_ax.text(0.98, 0.95, '', ha='right', va='top', 
+                                              transform=self.error_ax.transAxes)
+        self._nom_status = self.nibble_ax.text(0.02, 0.95, '', ha='left', va='top', 
+                                               transform=self.nibble_ax.transAxes)
+        
     def draw_architecture(self):
         """Draw the neural network architecture"""
         # Input layer
@@ -89,93 +195,147 @@ class NeuralVisualizer4004:
         self.arch_ax.set_xlim(0, 1)
         self.arch_ax.set_ylim(0, 1)
         
-    def parse_training_log(self, logfile):
-        """Parse training log from 4004 emulation"""
-        epochs = []
-        errors = []
-        weights = []
-        
-        with open(logfile, 'r') as f:
-            for line in f:
-                # Parse epoch errors
-                match = re.search(r'Epoch (\d+): (\d+) errors', line)
-                if match:
-                    epochs.append(int(match.group(1)))
-                    errors.append(int(match.group(2)))
-                
-                # Parse weight updates (Q4.4 format)
-                match = re.search(r'W\[(\d+)\] = 0x([0-9A-F]+)', line)
-                if match:
-                    idx = int(match.group(1))
-                    val = int(match.group(2), 16)
-                    # Convert Q4.4 to float
-                    weight_val = (val >> 4) + (val & 0x0F) / 16.0
-                    weights.append((idx, weight_val))
-        
-        return epochs, errors, weights
+    def rasterize_architecture(self):
+        """
+        Swap the static architecture diagram for a single image of it,
+        so every animation frame blits one image instead of redrawing
+        the circles, connections and labels
+        """
+        canvas = self.fig.canvas
+        # Render at the DPI the GIF is saved with, so the cached pixels
+        # land one-to-one on the frames
+        self.fig.set_dpi(_ANIMATION_DPI)
+        canvas.draw()
+        # Freeze the layout solved by that draw; left constrained, it
+        # would be re-solved on every frame the animation saves
+        self.fig.set_layout_engine('none')
+        # Display coordinates start at the bottom, image rows at the top
+        rgba = np.asarray(canvas.buffer_rgba())
+        x0, y0, x1, y1 = np.round(self.arch_ax.bbox.extents).astype(int)
+        image = rgba[rgba.shape[0] - y1:rgba.shape[0] - y0, x0:x1].copy()
+        
+        title = self.arch_ax.get_title()
+        self.arch_ax.clear()
+        self.arch_ax.imshow(image, extent=(0, 1, 0, 1), aspect='auto', 
+                            interpolation='nearest')
+        self.arch_ax.set_title(title)
+        self.arch_ax.axis('off')
+        
+    def parse_training_log(self, logfile, only_tail=False):
+        """
+        Parse training log from 4004 emulation
+        
+        Epochs and errors come back as int32 arrays, weights as parallel
+        (index, value) arrays; with only_tail, just the last set of
+        weights is kept instead of every update in the run.
+        """
+        epochs, errors, indices, raw = _parse_matches(logfile, only_tail)
+        
+        # Convert Q4.4 to float in one lookup; anything wider than a
+        # byte just carries more integer bits
+        values = (raw >> 8) * 16 + _Q44_LUT[raw & 0xFF]
+        
+        return epochs, errors, (indices, values)
     
-    def animate_training(self, logfile):
-        """Animate the training process"""
-        epochs, errors, weights = self.parse_training_log(logfile)
+    def animate_training(self, run):
+        """Animate the training process from a full parse_training_log result"""
+        epochs, errors, (weight_idx, weight_vals) = run
+        # Per-frame prefixes must be array views; list slices would copy
+        epochs, errors = np.asarray(epochs), np.asarray(errors)
+        weight_idx, weight_vals = np.asarray(weight_idx), np.asarray(weight_vals)
+        
+        # Fix the limits from the whole run; blitting needs static axes
+        self.error_ax.set_title('BGD Convergence')
+        self.error_ax.set_xlabel('Epoch')
+        self.error_ax.set_ylabel('Error Count')
+        self._err_line.set_data(epochs, errors)
+        self.error_ax.relim(visible_only=True)
+        self.error_ax.autoscale_view()
+        # Scatter offsets for the whole run; each frame passes a prefix view
+        err_points = np.column_stack((epochs, errors))
+        
+        self.weight_ax.set_title('Weight Distribution (Q4.4)')
+        self.weight_ax.set_xlabel('Weight Index')
+        self.weight_ax.set_ylabel('Value')
+        if len(weight_vals):
+            self.weight_ax.set_xlim(weight_idx.min() - 1, weight_idx.max() + 1)
+            self.weight_ax.set_ylim(min(0.0, weight_vals.min()), 
+                                    max(weight_vals.max(), 1.0) * 1.05)
+        
+        self.nibble_ax.set_xlabel('Clock Cycles @ 740 Hz')
+        self.nibble_ax.set_ylabel('Nibbles Consumed')
+        
+        # One consumption curve for the whole run (Poisson(4) nibbles per
+        # 10-cycle tick); frame f shows its first 10*f samples
+        ticks_full = np.arange(0, len(errors) * 100, 10)
+        consumption_full = np.cumsum(np.random.poisson(4, len(ticks_full)))
+        self.nibble_ax.set_xlim(0, max(len(errors) * 100, 1))
+        if len(consumption_full):
+            self.nibble_ax.set_ylim(0, consumption_full[-1] * 1.05)
         
         def update(frame):
             # Update error plot
             if frame < len(errors):
-                self.error_ax.clear()
-                self.error_ax.plot(epochs[:frame+1], errors[:frame+1], 
-                                 'b-', linewidth=2)
-                self.error_ax.scatter(epochs[:frame+1], errors[:frame+1], 
-                                    c='red', s=30)
-                self.error_ax.set_title(f'BGD Convergence (Epoch {frame})')
-                self.error_ax.set_xlabel('Epoch')
-                self.error_ax.set_ylabel('Error Count')
-                self.error_ax.grid(True, alpha=0.3)
+                self._err_line.set_data(epochs[:frame+1], errors[:frame+1])
+                self._err_scatter.set_offsets(err_points[:frame+1])
+                self._err_status.set_text(f'Epoch {frame}')
                 
                 # Show convergence point
-                if frame > 0 and errors[frame] == 0:
-                    self.error_ax.axvline(x=frame, color='green', 
-                                        linestyle='--', alpha=0.5)
-                    self.error_ax.text(frame, max(errors)/2, 
-                                     'Converged!', rotation=90, 
-                                     color='green')
+                converged = bool(frame > 0 and errors[frame] == 0)
+                if converged:
+                    self._converged_line.set_xdata([frame, frame])
+                    self._converged_text.set_position((frame, errors.max()/2))
+                self._converged_line.set_visible(converged)
+                self._converged_text.set_visible(converged)
             
             # Update weight visualization
-            if frame < len(weights) // 13:
-                self.weight_ax.clear()
-                current_weights = weights[frame*13:(frame+1)*13]
-                if current_weights:
-                    indices = [w[0] for w in current_weights]
-                    values = [w[1] for w in current_weights]
-                    self.weight_ax.bar(indices, values, color='purple', alpha=0.7)
-                    self.weight_ax.set_title('Weight Distribution (Q4.4)')
-                    self.weight_ax.set_xlabel('Weight Index')
-                    self.weight_ax.set_ylabel('Value')
+            if frame < len(weight_vals) // 13:
+                indices = weight_idx[frame*13:(frame+1)*13]
+                values = weight_vals[frame*13:(frame+1)*13]
+                for bar, idx, value in zip(self._weight_bars, indices, values):
+                    bar.set_x(idx - bar.get_width() / 2)
+                    bar.set_height(value)
             
             # Nibble consumption animation (nom nom)
-            self.nibble_ax.clear()
             nibbles_consumed = frame * 26  # 13 weights * 2 nibbles
-            ticks = np.arange(0, frame * 100, 10)
-            consumption = np.cumsum(np.random.poisson(4, len(ticks)))
-            self.nibble_ax.plot(ticks, consumption, 'g-', linewidth=2)
-            self.nibble_ax.fill_between(ticks, 0, consumption, alpha=0.3)
-            self.nibble_ax.set_title(f'🍪 NOM NOM: {nibbles_consumed} nibbles')
-            self.nibble_ax.set_xlabel('Clock Cycles @ 740 Hz')
-            self.nibble_ax.set_ylabel('Nibbles Consumed')
+            ticks = ticks_full[:frame * 10]
+            consumption = consumption_full[:frame * 10]
+            self._nom_line.set_data(ticks, consumption)
+            # A filled area has no set_data; swap in a new one
+            if self._nom_fill is not None:
+                self._nom_fill.remove()
+            self._nom_fill = self.nibble_ax.fill_between(ticks, 0, consumption, 
+                                                         color='C0', alpha=0.3)
+            self._nom_status.set_text(f'🍪 NOM NOM: {nibbles_consumed} nibbles')
             
-            return self.error_ax, self.weight_ax, self.nibble_ax
+            return (self._err_line, self._err_scatter, self._converged_line, 
+                    self._converged_text, self._err_status, *self._weight_bars, 
+                    self._nom_line, self._nom_fill, self._nom_status)
+        
+        # Constrained layout settles on this draw and is then frozen, so
+        # the cached diagram is captured at its final size
+        self.rasterize_architecture()
         
-        anim = FuncAnimation(self.fig, update, frames=len(errors), 
-                           interval=200, repeat=True)
+        # Long runs are decimated to at most ~_MAX_FRAMES frames, always
+        # ending on the last epoch; frame values stay epoch indices
+        stride = max(1, -(-len(errors) // _MAX_FRAMES))
+        frames = list(range(0, len(errors), stride))
+        if frames and frames[-1] != len(errors) - 1:
+            frames.append(len(errors) - 1)
         
-        plt.tight_layout()
+        anim = FuncAnimation(self.fig, update, frames=frames, 
+                           interval=_FRAME_INTERVAL_MS, repeat=True, blit=True)
         return anim
     
-    def plot_final_results(self, logfile):
-        """Generate final training summary plots"""
-        epochs, errors, weights = self.parse_training_log(logfile)
+    def plot_final_results(self, run):
+        """
+        Generate final training summary plots from a parse_training_log
+        result (an only_tail parse is enough)
+        """
+        epochs, errors, (_, weight_vals) = run
         
         # Create figure with philosophy
-        fig = plt.figure(figsize=(15, 10))
+        fig = plt.figure(figsize=(15, 10), layout='constrained')
         fig.suptitle('AGI4004: Proof That Intelligence Fits in 640 Bytes', 
                     fontsize=18, fontweight='bold')
         
@@ -196,66 +356,61 @@ class NeuralVisualizer4004:
         
         # Weight histogram
         ax2 = plt.subplot(2, 3, 2)
-        final_weights = [w[1] for w in weights[-13:]]
+        final_weights = weight_vals[-13:]
         ax2.hist(final_weights, bins=16, color='purple', alpha=0.7, 
                 edgecolor='black')
         ax2.set_title('Final Weight Distribution')
         ax2.set_xlabel('Weight Value (Q4.4)')
         ax2.set_ylabel('Count')
         
-        # Efficiency comparison
-        ax3 = plt.subplot(2, 3, 3)
+        # 4004 vs H100 comparison bars
         systems = ['4004\n(1971)', 'H100\n(2024)']
-        transistors = [2300, 80e9]
         colors = ['green', 'red']
-        ax3.bar(systems, np.log10(transistors), color=colors, alpha=0.7)
-        ax3.set_title('Transistor Count (log scale)')
-        ax3.set_ylabel('log₁₀(transistors)')
-        
-        # Power consumption
-        ax4 = plt.subplot(2, 3, 4)
-        power = [0.75, 700]  # Watts
-        ax4.bar(systems, power, color=colors, alpha=0.7)
-        ax4.set_title('Power Consumption')
-        ax4.set_ylabel('Watts')
-        
-        # Training speed
-        ax5 = plt.subplot(2, 3, 5)
-        speed = [0.1, 0.00001]  # Seconds for NAND
-        ax5.bar(systems, np.log10(speed), color=colors, alpha=0.7)
-        ax5.set_title('Training Time (log scale)')
-        ax5.set_ylabel('log₁₀(seconds)')
-        
-        # Efficiency metric
-        ax6 = plt.subplot(2, 3, 6)
-        efficiency = [100, 0.000003]  # Percentage
-        ax6.bar(systems, np.log10(efficiency + 1e-10), color=colors, alpha=0.7)
-        ax6.set_title('Computational Efficiency')
-        ax6.set_ylabel('log₁₀(efficiency %)')
-        
-        plt.tight_layout()
+        for pos, (title, ylabel), heights in zip(range(3, 7), _METRIC_AXES, _METRIC_HEIGHTS):
+            ax = plt.subplot(2, 3, pos)
+            ax.bar(systems, heights, color=colors, alpha=0.7)
+            ax.set_title(title)
+            ax.set_ylabel(ylabel)
+        
         return fig
 
 def main():
     """Main visualization entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: visualize_training.py <logfile>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Render AGI4004 training plots")
+    parser.add_argument('logfile', help="Training log from the 4004 emulation")
+    parser.add_argument('--animation', action=argparse.BooleanOptionalAction, 
+                        default=None, 
+                        help="Also render the training GIF "
+                             "(default: on at a terminal, off under CI)")
+    args = parser.parse_args()
+    
+    animate = args.animation
+    if animate is None:
+        animate = sys.stdout.isatty() and not os.environ.get('CI')
     
-    logfile = sys.argv[1]
     viz = NeuralVisualizer4004()
+    # Both outputs share a single parse of the log; the summary alone
+    # only needs the final set of weights
+    run = viz.parse_training_log(args.logfile, only_tail=not animate)
     
     # Generate static plot
-    fig = viz.plot_final_results(logfile)
+    fig = viz.plot_final_results(run)
     plt.savefig('output/visualizations/training_summary.png', dpi=150)
     
     # Create animation
-    anim = viz.animate_training(logfile)
-    anim.save('output/visualizations/training_animation.gif', writer='pillow')
+    if animate:
+        anim = viz.animate_training(run)
+        anim.save('output/visualizations/training_animation.gif', 
+                  writer=PillowWriter(fps=1000 // _FRAME_INTERVAL_MS), 
+                  dpi=_ANIMATION_DPI, savefig_kwargs={'facecolor': 'white'})
+    else:
+        # Nothing will be drawn on the dashboard; keep show() from opening it
+        plt.close(viz.fig)
     
     print("✓ Visualizations saved to output/visualizations/")
     print("  - training_summary.png")
-    print("  - training_animation.gif")
+    if animate:
+        print("  - training_animation.gif")
     
     plt.show()
 